@@ -1,6 +1,7 @@
 import pygame as pg
 
 from os import sys
+from functools import partial
 
 import interactive_objects as io
 import galaxy_system as gs
@@ -25,9 +26,26 @@ class Game:
     def __init__(self):
         pg.init()
         self.screen = pg.display.set_mode((WIDTH, HEIGHT))
+        self.screen_rect = self.screen.get_rect()
         self.clock = pg.time.Clock()
-        pg.key.set_repeat(500, 100)
         self.font = pg.font.Font(FONTTYPE, FONTSIZE)
+        # only these are queued, SDL drops every other event type in C
+        pg.event.set_blocked(None)
+        pg.event.set_allowed([pg.QUIT, pg.KEYDOWN, pg.MOUSEBUTTONDOWN])
+        # jump tables, handlers only record input for update() to consume
+        self.key_handlers = {
+            pg.K_ESCAPE: self.quit,
+            pg.K_w: partial(self.add_input, 'dy', -50),
+            pg.K_s: partial(self.add_input, 'dy', 50),
+            pg.K_d: partial(self.add_input, 'dx', 50),
+            pg.K_a: partial(self.add_input, 'dx', -50),
+        }
+        self.mouse_handlers = {
+            4: partial(self.add_zoom, 0.1),  # Scroll Wheel Up
+            5: partial(self.add_zoom, -0.1),  # Scroll Wheel Down
+        }
+        # zoom is a scale factor, every wheel notch multiplies it
+        self.input_state = {'dx': 0, 'dy': 0, 'zoom': 1.0}
 
     # MAIN LOOP ---------------------------------------
 
@@ -48,66 +66,93 @@ class Game:
         """Catch all events here."""
         for event in pg.event.get():
             if event.type == pg.QUIT:
-                pg.quit()
-                sys.exit()
-            if event.type == pg.KEYDOWN:
-                if event.key == pg.K_ESCAPE:
-                    pg.quit()
-                    sys.exit()
-                if event.key == pg.K_w:
-                    print('K_w')
-                    self.system.move_system(0, -50)
-                if event.key == pg.K_s:
-                    print('K_s')
-                    self.system.move_system(0, 50)
-                if event.key == pg.K_d:
-                    print('K_d')
-                    self.system.move_system(50, 0)
-                if event.key == pg.K_a:
-                    print('K_a')
-                    self.system.move_system(-50, 0)
-                if event.key == pg.K_SPACE:
-                    print('K_SPACE')
-
-            if event.type == pg.MOUSEBUTTONDOWN:
-                if event.button == 1:
-                    # Left Click
-                    print('Left Click')
-                if event.button == 3:
-                    # Right Click
-                    print('Right Click')
-                if event.button == 4:
-                    # Scroll Wheel Up
-                    print('Scroll Wheel Up')
-                    self.system.change_scale(0.1)
-                if event.button == 5:
-                    # Scroll Wheel Down
-                    print('Scroll Wheel Down')
-                    self.system.change_scale(-0.1)
+                self.quit()
+            elif event.type == pg.KEYDOWN:
+                self.dispatch(self.key_handlers.get(event.key))
+            elif event.type == pg.MOUSEBUTTONDOWN:
+                self.dispatch(self.mouse_handlers.get(event.button))
+
+    @staticmethod
+    def dispatch(handler):
+        if handler is not None:
+            handler()
+
+    # EVENT HANDLERS -----------------------------------
+
+    def quit(self):
+        pg.quit()
+        sys.exit()
+
+    def add_input(self, key, value):
+        self.input_state[key] += value
+
+    def add_zoom(self, percent):
+        # multiplied, not summed, so many notches in one frame never reach 0
+        self.input_state['zoom'] *= 1+percent
+
+    def consume_input(self):
+        """Apply and reset the input collected since the last frame."""
+        state = self.input_state
+        if state['dx'] or state['dy']:
+            self.move_system(state['dx'], state['dy'])
+        if state['zoom'] != 1:
+            self.change_scale(state['zoom']-1)
+        state['dx'] = state['dy'] = 0
+        state['zoom'] = 1.0
+
+    def move_system(self, dx, dy):
+        self.system.move_system(dx, dy)
+        self.background = None
+
+    def change_scale(self, percent):
+        self.system.change_scale(percent)
+        self.background = None
 
     def init(self):
         # Initialize
-        self.text_surface = self.font.render(TEXT, True, TEXTCOLOR, TEXTBACKGROUND)
+        # convert to the display format so blits don't convert per pixel
+        self.text_surface = self.font.render(TEXT, True, TEXTCOLOR, TEXTBACKGROUND).convert(self.screen)
         text = 'Time Scale = ' + str(TIMESCALE) + 'x'
-        self.text_surface1 = self.font.render(text, True, TEXTCOLOR, TEXTBACKGROUND)
+        self.text_surface1 = self.font.render(text, True, TEXTCOLOR, TEXTBACKGROUND).convert(self.screen)
+        # title in the topleft corner, time scale in the topright corner
+        self.text_pos = self.screen_rect.topleft
+        x, y = self.screen_rect.topright
+        self.text_pos1 = x - self.text_surface1.get_width(), y
+        self.background_color = pg.Color('Light Blue')
         self.system = gs.System('PS_2020.11.30_14.52.15 - Copy', self.screen)
+        # copy of the static layer, None when it has to be redrawn
+        self.background = None
+        self.dirty_rects = []
 
     def update(self):
         # Update
         pg.display.set_caption("{:.2f}".format(self.clock.get_fps()))
+        self.consume_input()
         self.m_pos = pg.mouse.get_pos()
         self.system.update(self.dt*TIMESCALE)
 
     def draw(self):
         # Draw
-        self.screen.fill(pg.color.Color("Light Blue"))
-        self.system.draw()
-        self.system.hover_display(self.m_pos)
-        self.screen.blit(self.text_surface, self.screen.get_rect().topleft)
-        x, y = self.screen.get_rect().topright
-        x -= self.text_surface1.get_rect().w
-        self.screen.blit(self.text_surface1, (x, y))
-        pg.display.flip()
+        if self.background is None:
+            self.draw_background()
+            dirty_rects = [self.screen_rect]
+        else:
+            # erase last frame's bodies with the static layer
+            dirty_rects = self.dirty_rects
+            for rect in dirty_rects:
+                self.screen.blit(self.background, rect, rect)
+        drawn_rects = self.system.draw_bodies()
+        drawn_rects += self.system.hover_display(self.m_pos)
+        pg.display.update(dirty_rects + drawn_rects)
+        self.dirty_rects = drawn_rects
+
+    def draw_background(self):
+        # Draw the static layer and keep a copy to erase with
+        self.screen.fill(self.background_color)
+        self.system.draw_background()
+        self.screen.blit(self.text_surface, self.text_pos)
+        self.screen.blit(self.text_surface1, self.text_pos1)
+        self.background = self.screen.copy()
 
 
 # Create game object.
@@ -1,27 +1,71 @@
 import pygame as pg
 
 import csv
+import itertools
+import numpy as np
 
 import interactive_objects as io
+import kernels as kn
 import math
 
+# columns read from the exo-planet archive csv
+STAR_COLUMNS = [('hostname', 'U64'), ('st_mass', 'f8'), ('st_rad', 'f8'), ('st_teff', 'f8')]
+PLANET_COLUMNS = [('pl_name', 'U64'), ('pl_orbper', 'f8'), ('pl_rade', 'f8'), ('pl_masse', 'f8')]
 
 class System:
-    """Class that holds star, planets, and other mass objects."""
+    """Class that holds star, planets, and other mass objects.
+    Planet state is kept in parallel arrays indexed like self.planets."""
     def __init__(self, filename, surface):
         self.surface = surface
-        host_star_dict, list_of_planet_dicts = self.load_csv(filename)
-        self.init_bodies(host_star_dict, list_of_planet_dicts)
+        self.surface_rect = surface.get_rect()
+        host_star_dict, planet_table = self.load_csv(filename)
+        self.init_bodies(host_star_dict, planet_table)
         self.font = pg.font.Font('freesansbold.ttf', 24)
 
-    def init_bodies(self, host_star_dict, list_of_planet_dicts):
+    def init_bodies(self, host_star_dict, planet_table):
         """Initialize host star and planets of the system."""
-        surface, x, y, star_dictionary = self.surface, *self.surface.get_rect().center[:], host_star_dict
-        self.host_star = io.Star(surface, x, y, star_dictionary)
-        self.planets = []
-        for dictionary in list_of_planet_dicts:
-            self.planets.append(io.Planet(self.surface, self.host_star, dictionary))
+        x, y = self.surface_rect.center
+        self.host_star = io.Star(self.surface, x, y, host_star_dict)
+        # the Planet objects are only views for hit-testing and text display
+        n = len(planet_table)
+        self.planets = [None]*n
+        names = planet_table.dtype.names
+        for i, row in enumerate(planet_table.tolist()):
+            self.planets[i] = io.Planet(self.surface, self.host_star, dict(zip(names, row)))
+        self.init_arrays(planet_table)
 
+    def init_arrays(self, planet_table):
+        """Compute the planet state arrays from the catalogue columns, all planets at once."""
+        n = len(planet_table)
+        star = self.host_star
+        T = planet_table['pl_orbper']*io.SEC_PER_DAY
+        self.mass = planet_table['pl_masse']*io.KG_PER_EARTH_MASS
+        self.radius = planet_table['pl_rade']*io.M_PER_EARTH_RADIUS
+        self.omega = 2*math.pi/T  # angular velocity [rad/s]
+        # r = ((GmT^2)/(4pi^2))^1/3
+        self.orbit_radius = np.cbrt(io.G*star.mass*T*T/io.FOUR_PI_SQ)  # [m]
+        self.r = self.orbit_radius*(star.scale*io.AU_PER_METER)  # [px]
+        # starting angles are picked by each Planet
+        self.theta = np.array([planet.theta for planet in self.planets], np.float64)
+        # buffers reused every frame to avoid temporaries
+        self.px, self.py = np.empty(n, np.float64), np.empty(n, np.float64)
+        self.xy_px = np.empty((n, 2), np.intp)
+        self.radius_px = np.empty(n, np.intp)
+        self.rect_w = np.empty(n, np.intp)
+        self.use_lut = np.empty(n, np.bool_)
+        # planets are bucketed by the cells their rect overlaps for hover_display,
+        # cell_ranges mirrors the (x0, y0, x1, y1) range each one is stored in
+        self.spatial_hash = io.SpatialHash()
+        self.cell_ranges = np.full((n, 4), np.iinfo(np.intp).min, np.intp)
+        self.update_radii()
+        self.update_positions()
+
+    def update_radii(self):
+        """Drawn and orbit radius dependent state, changes only with the scale."""
+        self.rect_w[:] = [planet.rect.w for planet in self.planets]
+        self.radius_px[:] = [round(w/2) for w in self.rect_w.tolist()]
+        # small orbits can use the cos/sin table without visible error
+        np.less(self.r, kn.LUT_MAX_RADIUS, out=self.use_lut)
 
     def move_system(self, dx, dy):
         x, y = self.host_star.pole[:]
@@ -29,45 +73,117 @@ class System:
         self.host_star.rect.center = self.host_star.pole
         for planet in self.planets:
             planet.pole = self.host_star.pole
+        self.sync_planets()
 
     def update(self, dt):
         self.host_star.move(dt)
-        for planet in self.planets:
-            planet.move(dt)
+        self.update_positions(dt)
+
+    def update_positions(self, dt=0):
+        """Advance every planet by dt and convert to cartesian, relative to the pole."""
+        kn.advance_orbits(self.theta, self.omega, self.r, self.use_lut, self.px, self.py, dt)
+        self.sync_planets()
+
+    def sync_planets(self):
+        """Write the array state back to the Planet views."""
+        x, y = self.host_star.pole
+        # unsafe cast truncates like InteractableObject.add
+        np.add(self.px, x, out=self.xy_px[:, 0], casting='unsafe')
+        np.add(self.py, y, out=self.xy_px[:, 1], casting='unsafe')
+        for planet, center, theta in zip(self.planets, self.xy_px.tolist(), self.theta.tolist()):
+            planet.rect.center = center
+            planet.theta = theta
+        self.update_spatial_hash()
+
+    def update_spatial_hash(self):
+        """Re-bucket only the planets whose rect crossed into different cells."""
+        # same as SpatialHash.cell_range, planet rects are square and centered like Rect.center
+        shift = self.spatial_hash.shift
+        left, top = self.xy_px[:, 0] - self.rect_w//2, self.xy_px[:, 1] - self.rect_w//2
+        ranges = np.stack((left, top, left+self.rect_w-1, top+self.rect_w-1), axis=1) >> shift
+        changed = np.flatnonzero((ranges != self.cell_ranges).any(axis=1))
+        for i in changed.tolist():
+            self.spatial_hash.update(self.planets[i])
+        self.cell_ranges = ranges
+
+    def gravity(self):
+        """Returns the force of gravity [N] between every pair of planets, like MassObject.gravity.
+        Element [i, j] is the force between planet i and planet j, the diagonal is 0."""
+        # Fg = G(m1)(m2)/r^2, r = radial distance between the orbits
+        dr = self.orbit_radius[:, None] - self.orbit_radius[None, :]
+        with np.errstate(divide='ignore'):
+            force = io.G*np.outer(self.mass, self.mass)/(dr*dr)
+        np.fill_diagonal(force, 0)
+        return force
+
+    def pairwise_distance_sq(self):
+        """Returns the squared distance [px^2] between every pair of planets, like PolarObject.polar_distance_sq."""
+        return kn.polar_pairwise_distance_sq(self.r, self.theta)
 
     def change_scale(self, percent):
         new_scale = self.host_star.scale*(1+percent)
         self.host_star.update_scale(new_scale)
         for planet in self.planets:
             planet.update_scale(new_scale)
+        self.r *= 1+percent
+        self.update_radii()
+        self.update_positions()
 
     def draw(self):
+        self.draw_background()
+        self.draw_bodies()
+
+    def draw_background(self):
+        """Draw what only changes with move_system and change_scale."""
         self.host_star.draw()
         for planet in self.planets:
-            planet.draw((255, 0, 255))
             planet.draw_orbit()
 
+    def draw_bodies(self):
+        """Draw what moves every frame, returns the rects that were drawn to."""
+        visible = self.visible_planets()
+        dirty = self.draw_planets((255, 0, 255), visible)
+        for rect, i in zip(dirty, visible.tolist()):
+            rect.union_ip(self.planets[i].draw_shadow())
+        return dirty
+
+    def visible_planets(self):
+        """Indices of the planets whose body or shadow lines reach into the surface."""
+        # the shadow lines are 10 rect widths long on either side of the center,
+        # the body blit reaches radius_px, round(w/2) rounds halves to even so use rect_w for the lines
+        reach = self.rect_w*10 + self.radius_px
+        x, y = self.xy_px[:, 0], self.xy_px[:, 1]
+        left, top, right, bottom = self.surface_rect.left, self.surface_rect.top, self.surface_rect.right, self.surface_rect.bottom
+        on_screen = (x+reach >= left) & (x-reach < right) & (y+reach >= top) & (y-reach < bottom)
+        return np.flatnonzero(on_screen)
+
+    def draw_planets(self, color, indices):
+        """Blit the indexed planet bodies from the circle cache in one blits call, returns the blitted rects."""
+        get_circle = io.InteractableObject.get_circle
+        return self.surface.blits([(get_circle(r, color), (x-r, y-r))
+                                   for (x, y), r in zip(self.xy_px[indices].tolist(), self.radius_px[indices].tolist())])
+
     def hover_display(self, m_pos):
-        """Creates a display at the mouse position if the mouse is over a point."""
+        """Creates a display at the mouse position if the mouse is over a point.
+        Returns the rects that were drawn to."""
         if self.host_star.rect.collidepoint(m_pos):
             # pixel perfect collision
             x, y = self.host_star.rect.topleft[:]
             pos_in_mask = (m_pos[0]-x, m_pos[1]-y)
-            if not self.host_star.mask.get_at(pos_in_mask):
+            if self.host_star.mask.get_at(pos_in_mask):
                 text_list = self.host_star.__repr__()
                 text_surfaces = self.render_text(text_list)
-                self.blit_text(self.surface, text_surfaces, m_pos)
-                return
-        for planet in self.planets:
+                return self.blit_text(self.surface, text_surfaces, m_pos)
+        for planet in self.spatial_hash.query(m_pos):
             if planet.rect.collidepoint(m_pos):
                 # pixel perfect collision
                 x, y = planet.rect.topleft[:]
                 pos_in_mask = (m_pos[0]-x, m_pos[1]-y)
-                if not planet.mask.get_at(pos_in_mask):
+                if planet.mask.get_at(pos_in_mask):
                     text_list = planet.__repr__()
                     text_surfaces = self.render_text(text_list)
-                    self.blit_text(self.surface, text_surfaces, m_pos)
-                    break
+                    return self.blit_text(self.surface, text_surfaces, m_pos)
+        return []
 
     # TEXT FUNCTIONS ----------------------------------
 
@@ -81,13 +197,16 @@ class System:
     @staticmethod
     def blit_text(target_surface, text_surfaces, pos, direction=True):
         # direction = True = descending, direction = False = Ascending
+        # returns the blitted rects
+        rects = []
         for i, text_surface in enumerate(text_surfaces):
             h, w = text_surface.get_rect().h, text_surface.get_rect().w
             if direction:
                 offset = (pos[0], pos[1]+(i*h))
             else:
                 offset = (pos[0], pos[1]-(i*h))
-            target_surface.blit(text_surface, offset)
+            rects.append(target_surface.blit(text_surface, offset))
+        return rects
 
     """Book keeping."""
 #         hostname:       Host Name
@@ -131,23 +250,18 @@ class System:
 
     @staticmethod
     def load_csv(filename):
-        """Returns host star dictionary and list of planet dictionaries"""
+        """Returns host star dictionary and structured array of planet columns."""
         with open(f'{filename}.csv') as csvfile:
-            csv_dict_reader = csv.DictReader(csvfile, delimiter=',')
-            list_of_planet_dicts = []
-            for row in csv_dict_reader:
-                star_dict = {
-                "hostname": row["hostname"],
-                "st_mass": float(row["st_mass"]),
-                "st_rad": float(row["st_rad"]),
-                "st_teff": float(row["st_teff"])
-
-            }
-                planet_dict = {
-                "pl_name": row["pl_name"],
-                "pl_orbper": float(row["pl_orbper"]),
-                "pl_rade": float(row["pl_rade"]),
-                "pl_masse": float(row["pl_masse"])
-            }
-                list_of_planet_dicts.append(planet_dict)
-            return star_dict, list_of_planet_dicts
+            header = next(csv.reader(csvfile))
+            # every row repeats the host star, so only the first one is parsed for it
+            first_line = next(csvfile)
+            star_row = System.read_columns([first_line], header, STAR_COLUMNS)[0]
+            planet_table = System.read_columns(itertools.chain([first_line], csvfile), header, PLANET_COLUMNS)
+        star_dict = dict(zip(star_row.dtype.names, star_row.tolist()))
+        return star_dict, planet_table
+
+    @staticmethod
+    def read_columns(lines, header, columns):
+        """Parse the (name, dtype) columns of csv lines in C straight into a structured array."""
+        return np.loadtxt(lines, dtype=columns, delimiter=',', quotechar='"', ndmin=1,
+                          usecols=[header.index(name) for name, _ in columns])
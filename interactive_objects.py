@@ -1,13 +1,89 @@
 import pygame as pg
 
 import math
+import numpy as np
 import random
 
+import kernels as kn
+
 SCALE = 50000/1 # (100px/1AU)
+# PHYSICAL CONSTANTS, computed once instead of per call
+METERS_PER_AU = 149.6e9
+AU_PER_METER = 1/METERS_PER_AU
+PX_PER_METER = SCALE*AU_PER_METER
+G = 6.67408e-11 # m^3 kg^-1 s^-2
+FOUR_PI_SQ = 4*math.pi*math.pi
+KG_PER_SOLAR_MASS = 1.989e30
+M_PER_SOLAR_RADIUS = 6.95700e8
+SEC_PER_DAY = 86400.0
+M_PER_EARTH_RADIUS = 6.371e6
+KG_PER_EARTH_MASS = 5.972e24
+# one generator for all batched random draws
+rng = np.random.default_rng()
+# math.cbrt is Python 3.11+
+cbrt = getattr(math, 'cbrt', lambda x: x**(1/3))
+# the night side sprite is pre-rendered for this many directions per turn
+SHADOW_ANGLE_STEPS = 64
+# spatial hash cells are 1 << SPATIAL_HASH_SHIFT px wide
+SPATIAL_HASH_SHIFT = 6
+
+class SpatialHash:
+    """Grid of square cells holding the objects whose rect overlaps them, for point hit-tests."""
+    __slots__ = ('shift', 'cells', 'ranges')
+
+    def __init__(self, shift=SPATIAL_HASH_SHIFT):
+        self.shift = shift
+        # (cx, cy) -> objects overlapping that cell
+        self.cells = {}
+        # object -> (x0, y0, x1, y1) inclusive cell range it is stored in
+        self.ranges = {}
+
+    def cell_range(self, rect):
+        shift = self.shift
+        return rect.left >> shift, rect.top >> shift, (rect.right-1) >> shift, (rect.bottom-1) >> shift
+
+    def insert(self, obj):
+        cell_range = self.ranges[obj] = self.cell_range(obj.rect)
+        x0, y0, x1, y1 = cell_range
+        cells = self.cells
+        for cx in range(x0, x1+1):
+            for cy in range(y0, y1+1):
+                cells.setdefault((cx, cy), []).append(obj)
+
+    def remove(self, obj):
+        x0, y0, x1, y1 = self.ranges.pop(obj)
+        cells = self.cells
+        for cx in range(x0, x1+1):
+            for cy in range(y0, y1+1):
+                cell = cells[cx, cy]
+                cell.remove(obj)
+                if not cell:
+                    del cells[cx, cy]
+
+    def update(self, obj):
+        """Re-bucket obj if its rect moved into different cells."""
+        cell_range = self.ranges.get(obj)
+        if cell_range is None:
+            self.insert(obj)
+        elif cell_range != self.cell_range(obj.rect):
+            self.remove(obj)
+            self.insert(obj)
+
+    def query(self, point):
+        """Objects whose rect may contain point, the rects still have to be tested."""
+        x, y = point
+        return self.cells.get((x >> self.shift, y >> self.shift), ())
+
 
 class InteractableObject:
     """Class for mouse interactable elements on the screen."""
+    # slots keep attributes in a fixed C array instead of a per-instance __dict__
+    __slots__ = ('surface', 'rect', 'xy', '_scale', '_m2c', '_c2m')
+    # (radius, color) -> pre-drawn filled circle, shared by every object
+    _circle_cache = {}
+
     def __init__(self, surface, x, y, w, h):
+        self.scale = SCALE
         self.surface = surface
         # get topleft position with x, y being the center
         # use round because rect rounds down, so 5.9 becomes 5
@@ -16,192 +92,206 @@ class InteractableObject:
         # (x, y) = screen coordinates where (1 px, 1 px) = (1 SCALE, 1 SCALE)
         # where 100 px = 1 AU, SCALE = 100 px / 1 AU
         self.xy = self.rect.center
-        """FIX LATER"""
-        self.scale = SCALE
 
     def __repr__(self):
         return f'{self.__class__.__name__}, rect: {self.rect}'
 
-    def __setattr__(self, attr, value):
-        """Helper function to set attributes for a dictionary of variable length."""
-        super().__setattr__(attr, value)
+    @property
+    def scale(self):
+        return self._scale
+
+    @scale.setter
+    def scale(self, scale):
+        # cache both conversion factors, they are used far more often than the scale changes
+        self._scale = scale
+        self._m2c = scale*AU_PER_METER
+        self._c2m = 1/self._m2c
 
     def draw(self, color):
         pg.draw.rect(self.surface, color, self.rect)
 
+    @classmethod
+    def get_circle(cls, radius, color):
+        """Return a cached surface of a filled circle centered at (radius, radius)."""
+        key = radius, color
+        circle = cls._circle_cache.get(key)
+        if circle is None:
+            size = 2*radius + 1
+            colorkey = (255, 255, 255) if tuple(color[:3]) == (0, 0, 0) else (0, 0, 0)
+            circle = pg.Surface((size, size))
+            circle.fill(colorkey)
+            pg.draw.circle(circle, color, (radius, radius), radius)
+            if pg.display.get_surface() is not None:
+                # match the display format so blits take the fast path
+                circle = circle.convert()
+            # colorkey + RLE so the blit skips the corners
+            circle.set_colorkey(colorkey, pg.RLEACCEL)
+            cls._circle_cache[key] = circle
+        return circle
+
+    def blit_circle(self, color, center, radius):
+        """Blit a cached circle, same arguments as pg.draw.circle."""
+        x, y = center
+        return self.surface.blit(self.get_circle(radius, color), (x-radius, y-radius))
+
     def meter_to_cart(self, meters):
         """Convert meters to scaled cartesian(pixel) coordinates."""
-        # 1 AU = 149.6e9 m
-        pixels = meters*self.scale/149.6e9
-        return pixels
+        return meters*self._m2c
 
     def cart_to_meter(self, cart):
         """Convert scaled cartesian(pixel) coordinates to meters."""
-        return cart*(1/self.scale)*149.6e9
+        return cart*self._c2m
 
     def distance(self, second_object):
         """Get the euclidean distance from the first object to the second object."""
         # r = (dx^2+dy^2)^1/2
         point_1, point_2 = self.xy, second_object.xy
-        delta_x, delta_y = self.sub(point_1, point_2)[:]
-        squared_sum = pow(delta_x, 2) + pow(delta_y, 2)
-        return math.sqrt(squared_sum)
+        return math.hypot(point_1[0]-point_2[0], point_1[1]-point_2[1])
+
+    def distance_sq(self, second_object):
+        """Squared distance, for comparisons that don't need the square root."""
+        point_1, point_2 = self.xy, second_object.xy
+        dx, dy = point_1[0]-point_2[0], point_1[1]-point_2[1]
+        return dx*dx + dy*dy
 
     @staticmethod
     def add(iter_1, iter_2):
-        """Add every element of two iterables."""
-        return tuple(int(a + b) for a, b in zip(iter_1, iter_2))
+        """Add two 2D points, truncated to pixels."""
+        return int(iter_1[0]+iter_2[0]), int(iter_1[1]+iter_2[1])
 
     @staticmethod
     def sub(iter_1, iter_2):
-        """Subtract every element of two iterables."""
-        return tuple(int(a - b) for a, b in zip(iter_1, iter_2))
+        """Subtract two 2D points."""
+        return iter_1[0]-iter_2[0], iter_1[1]-iter_2[1]
 
 
 class PolarObject(InteractableObject):
     """Class for any polar coordinate object."""
+    __slots__ = ('pole', 'rec_radius', 'r', 'theta', 'mask')
+    # (w, h) -> collision mask of a filled circle, shared by every object of that size
+    _mask_cache = {}
+
     def __init__(self, surface, pole, x, y, rect_radius):
         self.pole, self.rec_radius = pole, rect_radius
         self.r, self.theta = self.cartesian_to_polar(x, y)
         super().__init__(surface, x, y, rect_radius*2, rect_radius*2)
-        """FIX LATER"""
-        self.scale = SCALE
         self.mask = self.get_mask()
 
     # POLAR FUNCTIONS ---------------------------------------
 
     def get_mask(self):
-        """Return mask of the object for pixel perfect collisions."""
+        """Return mask of the object for pixel perfect collisions.
+        Masks are cached per rect size, callers must not modify them."""
         w, h = self.rect.w, self.rect.h
-        colorkey = (0, 0, 0)
-        surface = pg.Surface((w, h))
-        surface.set_colorkey(colorkey)
-        # fill the surface with the spherical object
-        color, center, radius = (255, 255, 255), self.rect.center, round(self.rect.w/2)
-        pg.draw.circle(surface, color, center, radius)
-        mask = pg.mask.from_surface(surface)
+        mask = self._mask_cache.get((w, h))
+        if mask is None:
+            colorkey = (0, 0, 0)
+            surface = pg.Surface((w, h))
+            surface.set_colorkey(colorkey)
+            # fill the surface with the spherical object, centered in the surface's own coordinates
+            color, center, radius = (255, 255, 255), (w//2, h//2), round(w/2)
+            pg.draw.circle(surface, color, center, radius)
+            mask = pg.mask.from_surface(surface)
+            self._mask_cache[(w, h)] = mask
         return mask
 
 
     def get_rel_to_pole(self, x, y):
         """Get the x, y position relative to the reference point of the polar coordinate, the pole."""
-        return self.sub((x, y), self.pole)
+        return x-self.pole[0], y-self.pole[1]
 
     def cartesian_to_polar(self, x, y):
         """Cartesian position to polar position where (0, 0) is the reference point."""
-        # r = (x^2+y^2)^2, theta = tan^-1(y/x)
+        # r = (x^2+y^2)^1/2, theta = atan2(y, x)
         # pole is the reference point of the coordinate system
+        # atan2 covers x == 0 and all four quadrants, atan(y/x) was wrong for x < 0
         x, y = self.get_rel_to_pole(x, y)
-        r = math.sqrt(pow(x, 2)+pow(y, 2))
-        # set specific code for edge cases
-        if x == 0 and y != 0:
-            sign = lambda x: (1, -1)[x < 0]
-            return r, sign(y)*math.pi/2
-        if x == 0 and y == 0:
-            return 0, 0
-        else:
-            theta = math.atan(y/x)
-        return r, theta
+        return math.hypot(x, y), math.atan2(y, x)
 
     def polar_to_cartesian(self, r, theta):
         """Polar position to cartesian position where (0, 0) is the reference point."""
-        # x = rcos(theta), y = rsin(theta)
-        x, y = r*math.cos(theta), r*math.sin(theta)
-        x, y = self.add((x, y), self.pole)
-        return x, y
+        # x = rcos(theta), y = rsin(theta), truncated to pixels
+        return int(r*math.cos(theta)+self.pole[0]), int(r*math.sin(theta)+self.pole[1])
 
     def polar_distance(self, second_object):
         """Get the euclidean distance from the first object to the second object.
         Where A,B are the objects and C is the origin."""
         # (r1^2 +  r2^2 -2r1r2cos(theta2-theta1))^1/2
+        return math.sqrt(self.polar_distance_sq(second_object))
+
+    def polar_distance_sq(self, second_object):
+        """Squared polar_distance, for comparisons that don't need the square root."""
         r1, r2 = self.r, second_object.r
         theta1, theta2 = self.theta, second_object.theta
-        return math.sqrt(pow(r1, 2)+pow(r2, 2)-(2*r1*r2*math.cos(theta1-theta2)))
+        return r1*r1 + r2*r2 - 2*r1*r2*math.cos(theta1-theta2)
 
     def radial_distance(self, second_object):
         return abs(self.r-second_object.r)
 
+    def radial_distance_sq(self, second_object):
+        dr = self.r-second_object.r
+        return dr*dr
+
 
 class Particle(PolarObject):
     """Base class for any particle. In polar to easily generate particles around circular objects."""
+    __slots__ = ('decay_rate', 'particles')
+
     def __init__(self, host_object):
         self.surface, self.pole = host_object.surface, host_object.pole
-        # how fast particles "decay" and get deleted once vw becomes 0
+        # how fast particles "decay" and get deleted once w becomes 0
         self.decay_rate = 2
 
     def generate_random_particles(self):
-        self.particles = []
-        self.particle_vectors = []
-        # vectors in polar form
-        number_of_particles = random.randint(0, 10)
-        for i in range(number_of_particles):
-            w = random.randint(1, 10)
-            self.particles.append(pg.Rect(self.pole, (w, w)))
-            vw, vr, theta =  random.randint(1, 30), random.randint(0, 10), random.uniform(0, 2*math.pi)
-            vector = pg.Vector2()
-            vector.from_polar((vr, theta))
-            self.particle_vectors.append([vector, vw])
+        # structure of arrays, one contiguous (x, y, vx, vy, w) field per row, see kernels.PX
+        n = int(rng.integers(0, 11))
+        self.particles = np.empty((5, n), np.float32)
+        self.particles[kn.PX] = self.pole[0]
+        self.particles[kn.PY] = self.pole[1]
+        # velocities in polar form, the angle in radians
+        vr, theta = rng.integers(0, 11, n), rng.uniform(0, 2*math.pi, n)
+        self.particles[kn.PVX] = vr*np.cos(theta)
+        self.particles[kn.PVY] = vr*np.sin(theta)
+        self.particles[kn.PW] = rng.integers(1, 11, n)
 
     def update(self, dt):
-        del_set = []
-        for i in range(len(self.particles)):
-            vector, vw = self.particle_vectors[i][:]
-            vx, vy = vector.xy[:]
-            dx, dy = vx*dt, vy*dt
-            p = self.particles[i]
-            print(p, dx, dy)
-            p = p.move(dx, dy)
-            print(p)
-            # update w
-            p.w -= self.decay_rate
-            p.h -= self.decay_rate
-            # remove 0 or, negative w, h rects
-            if p.w <= 0:
-                # don't remove during iteration
-                del_set.append(p)
-                del_set.append(vector)
-        if len(del_set) != 0:
-            # https://stackoverflow.com/questions/36268749/remove-multiple-items-from-a-python-list-in-just-one-statement
-            item_list = self.particles
-            self.particles = [elm for elm in item_list if elm not in (del_set)]
-            item_list = self.particle_vectors
-            self.particle_vectors = [elm for elm in item_list if elm not in (del_set)]
-        if len(self.particles) == 0:
+        # 0 or, negative w particles are dropped by slicing off the tail
+        alive = kn.advance_particles(self.particles, dt, self.decay_rate)
+        self.particles = self.particles[:, :alive]
+        if alive == 0:
             self.generate_random_particles()
 
     def draw(self):
-        for particle in self.particles:
-            pg.draw.circle(self.surface, (0, 0, 0), particle.center, particle.w)
+        # cast to pixels once for all particles
+        xs, ys, ws = self.particles[(kn.PX, kn.PY, kn.PW), :].astype(np.intp).tolist()
+        for x, y, w in zip(xs, ys, ws):
+            pg.draw.circle(self.surface, (0, 0, 0), (x, y), w)
 
 
 class MassObject(PolarObject):
-    """Class for any mass object; stars, planet, asteriods."""
+    """Class for any mass object; stars, planet, asteriods.
+    Subclasses set name, mass and radius in SI units from the catalogue dictionary in convert_units."""
+    __slots__ = ('dictionary', 'name', 'mass', 'radius')
+
     def __init__(self, surface, pole, x, y, mass_object_dictionary):
         # MassObject specific attributes
-        # set a dictionary for the object using the object name: so self.MassObject_dictionary = dictionary
-        self.__setattr__(self.__class__.__name__ + '_dictionary', mass_object_dictionary)
-        self.set_attr_from_dict(mass_object_dictionary)
-        self.G = 6.67408e-11 # m^3 kg^-1 s^-2
+        # the catalogue row is kept for __repr__, only the SI values become attributes
+        self.dictionary = mass_object_dictionary
         # will use a scale in terms of AU to keep track of objects relative to the surface,
         # but SI units for computations.
         # surface is in cartesian coordinates, but computations will exist in polar coordinates
-        rect_radius = self.convert_by_type()
+        self.convert_units(mass_object_dictionary)
+        # the scale is only set by InteractableObject.__init__, every body starts at SCALE
+        rect_radius = self.radius*PX_PER_METER
         super().__init__(surface, pole, x, y, rect_radius)
-        """FIX LATER"""
-        self.scale = SCALE
 
     def __repr__(self):
-        dictionary = getattr(self, str(self.__class__.__name__) + '_dictionary')
+        dictionary = self.dictionary
         string_list = []
         for key in dictionary:
             string_list.append(f'{key}: {dictionary.get(key)}')
         return string_list
 
-    def set_attr_from_dict(self, dictionary):
-        """Set attr using dict keys as attr names and values as attr values."""
-        for key in dictionary:
-            self.__setattr__(key, dictionary.get(key))
-
     def update_scale(self, new_scale):
         ratio = new_scale/self.scale
         # update all the attributes of the object
@@ -215,47 +305,22 @@ class MassObject(PolarObject):
             self.rect.w, self.rect.h = round(rect_radius*2), round(rect_radius*2)
         self.r = self.r*ratio
         # resize mask
-        w, h = self.rect.w, self.rect.h
-        self.mask = self.mask.scale((w, h))
+        self.mask = self.get_mask()
 
     def draw(self, color):
-        center, radius = self.rect.center, self.rect.w
-        pg.draw.circle(self.surface, color, center, radius)
-
-    def convert_by_type(self):
-        """Convert dict values whether the MassObject is a Star or Planet."""
-        if isinstance(self, Star):
-            self.name = self.hostname
-            # https://stackoverflow.com/questions/11637293/iterate-over-object-attributes-in-python
-            # returns list in alphabetical order
-            star_attr_list = list(filter(lambda attr: attr.startswith('st_'), dir(self)))
-            st_mass, st_rad, st_teff = star_attr_list[:]
-            st_mass, st_rad, st_teff = getattr(self, st_mass), getattr(self, st_rad), getattr(self, st_teff)
-            self.mass, self.radius, self.teff = *self.convert_stellar_to_si(st_mass, st_rad), st_teff
-            rect_radius = self.meter_to_cart(self.radius)
-            return rect_radius
-        if isinstance(self, Planet):
-            # https://stackoverflow.com/questions/11637293/iterate-over-object-attributes-in-python
-            # returns list in alphabetical order
-            planet_attr_list = list(filter(lambda attr: attr.startswith('pl_'), dir(self)))
-            pl_masse, pl_name, pl_orbper, pl_rade = planet_attr_list[:]
-            pl_masse, pl_name, pl_orbper, pl_rade = getattr(self, pl_masse), getattr(self, pl_name), getattr(self, pl_orbper), getattr(self, pl_rade)
-            self.name = pl_name
-            self.mass, self.T, self.radius = self.convert_earth_to_si(pl_masse, pl_orbper, pl_rade)
-            rect_radius = self.meter_to_cart(self.radius)
-            return rect_radius
+        center, radius = self.rect.center, round(self.rect.w/2)
+        self.blit_circle(color, center, radius)
 
     def gravity(self, second_object):
         """Returns force of gravity exerted by the mass object on the second object and vice versa."""
         # Fg = F12 = F21 = G(m1)(m2)/r^2
         m1, m2 = self.mass, second_object.mass
-        r = self.radial_distance(second_object)
-        return (self.G*m1*m2)/pow(r, 2)
+        return (G*m1*m2)/self.radial_distance_sq(second_object)
 
     @staticmethod
     def volume(radius):
         # V = 4/3(pi)(r^3), m^3
-        return (4/3)*(math.pi)*(pow(radius, 3))
+        return (4/3)*(math.pi)*(radius*radius*radius)
 
     @staticmethod
     def density(mass, volume):
@@ -265,28 +330,30 @@ class MassObject(PolarObject):
 
 class Star(MassObject):
     """We will assume only stars exert significant enough gravity to reduce computation."""
+    __slots__ = ('teff',)
+
     def __init__(self, surface, x, y, star_dictionary):
         # stellar rad -> meters -> scaled cart(px)
         # stellar mass -> kg and so forth
         pole = (x, y) # Stars will be the center of the system
         # so, the (r, theta) = self.cartesian_to_polar((x, y) - pole)
         # (r, theta) =  self.cartesian_to_polar(0, 0) = (0, 0)
-        """FIX LATER"""
-        self.scale = SCALE
         super().__init__(surface, pole, x, y, star_dictionary)
 
     def move(self, dt):
         """Group all time functions here."""
         dt = dt
 
-    def convert_stellar_to_si(self, st_mass, st_rad):
-        # convert stellar units to SI units
-        # stellar mass = 1.989e30 kg.
-        # stellar radius = 695700e3 m
+    def convert_stellar_to_si(self, star_dictionary):
+        # convert stellar units to SI units, keys are read straight from the catalogue row
         # stellar effective temperature = k
-        mass = 1.989e30*st_mass
-        radius = 6.95700e8*st_rad
-        return mass, radius
+        mass = KG_PER_SOLAR_MASS*star_dictionary['st_mass']
+        radius = M_PER_SOLAR_RADIUS*star_dictionary['st_rad']
+        return mass, radius, star_dictionary['st_teff']
+
+    def convert_units(self, star_dictionary):
+        self.name = star_dictionary['hostname']
+        self.mass, self.radius, self.teff = self.convert_stellar_to_si(star_dictionary)
 
     def draw(self):
         """Group star specific drawing functions."""
@@ -312,65 +379,88 @@ class Star(MassObject):
 
     def draw_body(self):
         color, center, radius = (255, 255, 0), self.rect.center, round(self.rect.w/2)
-        pg.draw.circle(self.surface, color, center, radius)
+        self.blit_circle(color, center, radius)
 
 class Planet(MassObject):
     """Planets are always relative to a Star."""
+    __slots__ = ('host_star', 'T', 'orbit_radius', 'vw', 'omega')
+    # (w, direction step) -> pre-drawn night side, shared by every planet
+    _shadow_cache = {}
+
     def __init__(self, surface, host_star, planet_dictionary):
         # initialize the position of the planet to a given star
         self.host_star = host_star
         pole = self.host_star.pole
-        """FIX LATER"""
-        self.scale = SCALE
         """HACK FIX FOR NOW."""
         x, y = 0, 0
         super().__init__(surface, pole, x, y, planet_dictionary)
         """HACK FIX FOR NOW."""
-        self.r = self.meter_to_cart(self.get_radial_distance_from(self.host_star))
+        # M and T never change, so the orbit radius [m] is solved once
+        self.orbit_radius = self.get_radial_distance_from(self.host_star)
+        self.r = self.meter_to_cart(self.orbit_radius)
         self.theta = random.uniform(0, 2*math.pi)
         self.rect.center = self.polar_to_cartesian(self.r, self.theta)
         self.rect.w = self.rect.w
-        self.vw = self.get_angular_velocity(self.get_radial_distance_from(self.host_star), self.T)
+        self.vw = self.get_angular_velocity(self.orbit_radius, self.T)
+        # d(theta)/dt = vw/r = 2(pi)/T, paid once here instead of every frame
+        self.omega = 2*math.pi/self.T
 
     def __str__(self):
         return f'{self.__class__.__name__}, rect: {self.rect}'
 
-    def get_subsurface(self):
-        """Generate a subsurface bound by the instance rect."""
-        w, h = self.rect.w, self.rect.h
-        surface = pg.Surface((w, h))
-        surface.set_colorkey((0, 0, 0))
-        return pg.Surface((w, h))
-
     def move(self, dt):
         """Group all time functions here."""
-        w_px = self.meter_to_cart(self.vw)
-        # delta_theta = delta_s/r
-        self.theta += self.vw*dt/self.get_radial_distance_from(self.host_star)
+        self.theta += self.omega*dt
         self.rect.center = self.polar_to_cartesian(self.r, self.theta)
 
     def draw(self, color):
         self.draw_planet(color)
         self.draw_orbit()
-        x1, y1, x2, y2 = *self.host_star.rect.center[:], *self.rect.center[:]
-        othorg_vector = self.get_orthog_norm(x1, y1, x2, y2)
-        othorg_vector.scale_to_length(self.rect.w*10)
-        pos1 = self.rect.center[0]-othorg_vector.x, self.rect.center[1]-othorg_vector.y
-        pos2 = self.rect.center[0]+othorg_vector.x, self.rect.center[1]+othorg_vector.y
-        pg.draw.line(self.surface, (255, 0, 0), self.rect.center, pos1)
-        pg.draw.line(self.surface, (255, 0, 0), self.rect.center, pos2)
-        shadow_surface = self.get_subsurface()
-        x1, y1, y1, y2 = *pos1[:], *pos2[:]
-        r1, start_angle, r2, end_angle = *self.cartesian_to_polar(x1, y1), *self.cartesian_to_polar(x2, y2)
-        pg.draw.arc(self.surface, (0, 0, 0), self.rect, start_angle, end_angle, int(self.rect.w/2))
+        self.draw_shadow()
 
+    def draw_shadow(self):
+        """Draw the tangent lines and the night side of the planet, returns the drawn area."""
+        x1, y1, x2, y2 = *self.host_star.rect.center[:], *self.rect.center[:]
+        # tangent lines 10 rect widths long on either side of the center
+        length = self.rect.w*10
+        ox, oy = self.get_orthog_norm(x1, y1, x2, y2)
+        ox, oy = ox*length, oy*length
+        pos1 = x2-ox, y2-oy
+        pos2 = x2+ox, y2+oy
+        line1 = pg.draw.line(self.surface, (255, 0, 0), (x2, y2), pos1)
+        line2 = pg.draw.line(self.surface, (255, 0, 0), (x2, y2), pos2)
+        # the night side faces away from the star
+        step = round(math.atan2(y2-y1, x2-x1)*SHADOW_ANGLE_STEPS/(2*math.pi)) % SHADOW_ANGLE_STEPS
+        arc = self.surface.blit(self.get_shadow(self.rect.w, step), self.rect.topleft)
+        return line1.union(line2).union(arc)
+
+    @classmethod
+    def get_shadow(cls, w, step):
+        """Return a cached surface of the half of a w wide planet facing direction step."""
+        key = w, step
+        shadow = cls._shadow_cache.get(key)
+        if shadow is None:
+            colorkey = (255, 255, 255)
+            shadow = pg.Surface((w, w))
+            shadow.fill(colorkey)
+            # arc angles go counterclockwise, screen angles go clockwise
+            angle = -step*2*math.pi/SHADOW_ANGLE_STEPS
+            pg.draw.arc(shadow, (0, 0, 0), shadow.get_rect(), angle-math.pi/2, angle+math.pi/2, int(w/2))
+            if pg.display.get_surface() is not None:
+                shadow = shadow.convert()
+            shadow.set_colorkey(colorkey, pg.RLEACCEL)
+            cls._shadow_cache[key] = shadow
+        return shadow
 
     @staticmethod
     def get_orthog_norm(x1, y1, x2, y2):
+        """Unit vector perpendicular to (x1, y1) -> (x2, y2), (0, 0) if the points coincide."""
         dx, dy = (x2-x1, y2-y1)
-        vector = pg.math.Vector2((-dy, dx))
-        vector.normalize()
-        return vector
+        length = math.hypot(dx, dy)
+        if length == 0:
+            return 0.0, 0.0
+        inv = 1/length
+        return -dy*inv, dx*inv
 
     @staticmethod
     def get_angular_velocity(r, T):
@@ -386,24 +476,25 @@ class Planet(MassObject):
 
     def draw_planet(self, color):
         center, radius = self.rect.center, round(self.rect.w/2)
-        pg.draw.circle(self.surface, color, center, radius)
+        self.blit_circle(color, center, radius)
 
     def draw_orbit(self):
+        # only drawn with the static background, a 1 px outline is cheaper to draw than to cache
         pg.draw.circle(self.surface, (0, 0, 255), self.pole, int(self.r), 1)
 
-    def convert_earth_to_si(self, pl_orbper, pl_mass, pl_rad):
-        """Convert earth units to SI units."""
-        # 1 day = 24*60*60 s
-        # 1 earth radius = 6.371e6 m
-        # 1 earth mass = 5.972e24 kg
-        T, radius, mass = pl_orbper*24*60*60, pl_rad*6.371e6, pl_mass*5.972e24
+    def convert_earth_to_si(self, planet_dictionary):
+        """Convert the earth units of a catalogue row to SI units."""
+        T = planet_dictionary['pl_orbper']*SEC_PER_DAY
+        radius = planet_dictionary['pl_rade']*M_PER_EARTH_RADIUS
+        mass = planet_dictionary['pl_masse']*KG_PER_EARTH_MASS
         return mass, T, radius
 
+    def convert_units(self, planet_dictionary):
+        self.name = planet_dictionary['pl_name']
+        self.mass, self.T, self.radius = self.convert_earth_to_si(planet_dictionary)
+
     def get_radial_distance_from(self, star):
         """Radial distance from a star using planet's orbital period."""
         # T = (4pi^2r^3/(Gm1))^1/2
         # r = ((GmT^2)/(4pi^2))^1/3
-        G = 6.67408e-11
-        numerator = G*star.mass*pow(self.T, 2)
-        denominator = 4*pow(math.pi, 2)
-        return pow(numerator/denominator, 1/3)
+        return cbrt(G*star.mass*self.T*self.T/FOUR_PI_SQ)
@@ -0,0 +1,135 @@
+import numpy as np
+
+import math
+
+# numba is optional, every kernel has a NumPy fallback
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+# below this many bodies the thread pool costs more than it saves
+PARALLEL_THRESHOLD = 1000
+
+# cos/sin lookup table, one turn in LUT_SIZE steps
+LUT_SIZE = 4096
+LUT_MASK = LUT_SIZE - 1
+LUT_STEPS_PER_RAD = LUT_SIZE/(2*math.pi)
+COS_LUT = np.cos(np.arange(LUT_SIZE)/LUT_STEPS_PER_RAD)
+SIN_LUT = np.sin(np.arange(LUT_SIZE)/LUT_STEPS_PER_RAD)
+# rounding to the nearest step is off by at most r*pi/LUT_SIZE [px],
+# orbits smaller than this radius [px] stay within LUT_MAX_ERROR of the exact position
+LUT_MAX_ERROR = 0.5
+LUT_MAX_RADIUS = LUT_MAX_ERROR*LUT_SIZE/math.pi
+
+
+def _advance_orbits(theta, omega, r, use_lut, px, py, dt):
+    # fastmath lets numba use SVML sin/cos when icc_rt is installed
+    for i in prange(theta.shape[0]):
+        theta[i] += omega[i]*dt
+        if use_lut[i]:
+            j = int(math.floor(theta[i]*LUT_STEPS_PER_RAD + 0.5)) & LUT_MASK
+            px[i] = r[i]*COS_LUT[j]
+            py[i] = r[i]*SIN_LUT[j]
+        else:
+            px[i] = r[i]*math.cos(theta[i])
+            py[i] = r[i]*math.sin(theta[i])
+
+
+if njit is not None:
+    # numba's disk cache doesn't key on parallel=, so only one build of a function may use it,
+    # the parallel one compiles on first use instead of loading the serial code
+    _advance_orbits_serial = njit(fastmath=True, cache=True, error_model='numpy')(_advance_orbits)
+    _advance_orbits_parallel = njit(fastmath=True, error_model='numpy', parallel=True)(_advance_orbits)
+
+
+def advance_orbits(theta, omega, r, use_lut, px, py, dt):
+    """Advance theta by omega*dt and write r*cos(theta), r*sin(theta) into px, py.
+    Bodies flagged in the boolean use_lut array read cos/sin from the lookup table.
+    All other arrays are contiguous float64 and updated in place."""
+    dt = float(dt)
+    if njit is None:
+        theta += omega*dt
+        exact = ~use_lut
+        px[exact] = r[exact]*np.cos(theta[exact])
+        py[exact] = r[exact]*np.sin(theta[exact])
+        j = np.floor(theta[use_lut]*LUT_STEPS_PER_RAD + 0.5).astype(np.intp) & LUT_MASK
+        px[use_lut] = r[use_lut]*COS_LUT[j]
+        py[use_lut] = r[use_lut]*SIN_LUT[j]
+    elif theta.shape[0] < PARALLEL_THRESHOLD:
+        _advance_orbits_serial(theta, omega, r, use_lut, px, py, dt)
+    else:
+        _advance_orbits_parallel(theta, omega, r, use_lut, px, py, dt)
+
+
+def _polar_pairwise_distance_sq(r, theta, out):
+    # law of cosines is symmetric, each row fills its upper half and mirrors it
+    for i in prange(r.shape[0]):
+        out[i, i] = 0.0
+        for j in range(i+1, r.shape[0]):
+            d = r[i]*r[i] + r[j]*r[j] - 2*r[i]*r[j]*math.cos(theta[i]-theta[j])
+            out[i, j] = d
+            out[j, i] = d
+
+
+if njit is not None:
+    _polar_pairwise_distance_sq_serial = njit(fastmath=True, cache=True)(_polar_pairwise_distance_sq)
+    # not cached, see _advance_orbits_parallel
+    _polar_pairwise_distance_sq_parallel = njit(fastmath=True, parallel=True)(_polar_pairwise_distance_sq)
+
+
+def polar_pairwise_distance_sq(r, theta, out=None):
+    """Squared distance between every pair of polar points (r, theta), like PolarObject.polar_distance_sq.
+    Returns an (N, N) float64 array, written into out when it is given."""
+    n = r.shape[0]
+    if out is None:
+        out = np.empty((n, n), np.float64)
+    if njit is None:
+        # r1^2 + r2^2 - 2r1r2cos(theta1-theta2)
+        r_sq = r*r
+        np.multiply(np.outer(r, r), np.cos(theta[:, None]-theta[None, :]), out=out)
+        out *= -2
+        out += r_sq[:, None]
+        out += r_sq[None, :]
+        np.fill_diagonal(out, 0)
+    elif n < PARALLEL_THRESHOLD:
+        _polar_pairwise_distance_sq_serial(r, theta, out)
+    else:
+        _polar_pairwise_distance_sq_parallel(r, theta, out)
+    return out
+
+
+# particle array fields, particles[PX] is the x of every particle
+PX, PY, PVX, PVY, PW = range(5)
+
+
+def _advance_particles(particles, dt, decay_rate):
+    # survivors are written back over the front of each field in the same pass
+    n = 0
+    for i in range(particles.shape[1]):
+        w = particles[PW, i] - decay_rate
+        if w > 0:
+            particles[PX, n] = particles[PX, i] + particles[PVX, i]*dt
+            particles[PY, n] = particles[PY, i] + particles[PVY, i]*dt
+            particles[PVX, n] = particles[PVX, i]
+            particles[PVY, n] = particles[PVY, i]
+            particles[PW, n] = w
+            n += 1
+    return n
+
+
+if njit is not None:
+    _advance_particles_jit = njit(fastmath=True, cache=True)(_advance_particles)
+
+
+def advance_particles(particles, dt, decay_rate):
+    """Move a (5, N) array of x, y, vx, vy, w particle fields by dt and shrink w by decay_rate.
+    Particles still alive (w > 0) are moved to the front in order, returns their count."""
+    if njit is None:
+        particles[PX:PY+1] += particles[PVX:PVY+1]*dt
+        particles[PW] -= decay_rate
+        alive = particles[PW] > 0
+        n = int(np.count_nonzero(alive))
+        particles[:, :n] = particles[:, alive]
+        return n
+    return _advance_particles_jit(particles, float(dt), float(decay_rate))